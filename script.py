@@ -1,8 +1,15 @@
 import tweepy
-import json
+import orjson
 import os
-import requests
+import asyncio
+import aiohttp
 import logging
+import random
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime, timezone
 
 
@@ -10,7 +17,51 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 CONFIG_FILE = 'config.json'
 SENT_TWEETS_FILE = 'sent_tweets.txt' 
+SINCE_IDS_FILE = 'since_ids.json'
 BEARER_TOKEN_ENV_VAR = 'TWITTER_BEARER_TOKEN'
+# Recent search only covers the last 7 days, so older sent IDs can never come back
+SENT_TWEETS_RETENTION_SECONDS = 8 * 86400
+# Searches run in parallel threads; this caps how many Twitter requests are in flight at once
+TWITTER_MAX_WORKERS = 4
+TWITTER_PAGE_SIZE = 15 # Enough slack over TWITTER_MAX_SENDS_PER_QUERY for typical filter losses
+TWITTER_MIN_PAGE_SIZE = 10 # Smallest max_results recent search accepts
+TWITTER_MAX_SENDS_PER_QUERY = 5
+DISCORD_MAX_ATTEMPTS = 5
+DISCORD_MAX_EMBEDS = 10 # Discord accepts at most 10 embeds per message
+DISCORD_MAX_EMBED_CHARS = 6000 # ...and at most this many characters across all of them
+DISCORD_RATE_LIMIT = 5 # Requests allowed per webhook...
+DISCORD_RATE_PERIOD = 2.0 # ...every this many seconds
+DISCORD_POOL_MAXSIZE = 16 # Keep-alive connections per webhook host
+DISCORD_CONNECT_TIMEOUT = 3
+DISCORD_READ_TIMEOUT = 10
+# Keywords containing whitespace or query operators must be quoted to search as an exact phrase
+_NEEDS_QUOTE = re.compile(r'[\s#@$:()\[\]{}"\']').search
+
+class TokenBucket:
+    """Throttles requests to a single webhook to `rate` per `per` seconds."""
+
+    def __init__(self, rate=DISCORD_RATE_LIMIT, per=DISCORD_RATE_PERIOD):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.ts = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Waits until a request may be sent, then consumes a token."""
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.ts) * self.rate / self.per)
+            self.ts = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+                self.ts = time.monotonic()
+                self.tokens = 0
+            else:
+                self.tokens -= 1
+
+# One bucket per webhook URL, shared by every concurrent post to it
+_BUCKETS = defaultdict(TokenBucket)
 
 def load_config():
     """Loads configuration from config.json."""
@@ -18,11 +69,11 @@ def load_config():
         logging.error(f"Configuration file '{CONFIG_FILE}' not found. Please create it.")
         exit(1)
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            config = json.load(f)
+        with open(CONFIG_FILE, 'rb') as f:
+            config = orjson.loads(f.read())
         
         return config
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logging.error(f"Error decoding JSON from '{CONFIG_FILE}'. Please check its syntax.")
         exit(1)
     except Exception as e:
@@ -30,36 +81,90 @@ def load_config():
         exit(1)
 
 def load_sent_tweet_ids():
-    """Loads previously sent tweet IDs from a file."""
+    """Loads previously sent tweet IDs from a file, pruning entries past the retention window."""
     if not os.path.exists(SENT_TWEETS_FILE):
         return set()
+    now = int(time.time())
+    cutoff = now - SENT_TWEETS_RETENTION_SECONDS
+    entries = {}
+    needs_rewrite = False
     try:
         with open(SENT_TWEETS_FILE, 'r') as f:
-            return {line.strip() for line in f if line.strip()}
+            for line in f:
+                tweet_id, _, sent_at = line.strip().partition('\t')
+                if not tweet_id:
+                    continue
+                if not tweet_id.isdigit():
+                    # Drop malformed lines the next time the file is rewritten
+                    needs_rewrite = True
+                    continue
+                tweet_id = int(tweet_id)
+                if sent_at.isdigit():
+                    sent_at = int(sent_at)
+                else:
+                    # Entries written before timestamps were recorded start their retention window now
+                    sent_at = now
+                    needs_rewrite = True
+                if sent_at < cutoff:
+                    needs_rewrite = True
+                    continue
+                entries[tweet_id] = sent_at
     except Exception as e:
         logging.error(f"Error loading sent tweet IDs: {e}")
         return set()
+    if needs_rewrite:
+        rewrite_sent_tweet_ids(entries)
+    return set(entries)
 
-def save_sent_tweet_id(tweet_id):
-    """Saves a new tweet ID to the file."""
+def rewrite_sent_tweet_ids(entries):
+    """Replaces the sent tweets file with the given tweet ID to timestamp entries."""
+    tmp_file = f"{SENT_TWEETS_FILE}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            f.write("".join(f"{tweet_id}\t{sent_at}\n" for tweet_id, sent_at in entries.items()))
+        os.replace(tmp_file, SENT_TWEETS_FILE)
+    except Exception as e:
+        logging.error(f"Error pruning sent tweet IDs: {e}")
+
+def save_sent_tweet_ids(tweet_ids):
+    """Appends newly sent tweet IDs to the file in a single write."""
+    if not tweet_ids:
+        return
+    sent_at = int(time.time())
     try:
         with open(SENT_TWEETS_FILE, 'a') as f:
-            f.write(f"{tweet_id}\n")
+            f.write("".join(f"{tweet_id}\t{sent_at}\n" for tweet_id in tweet_ids))
+    except Exception as e:
+        logging.error(f"Error saving {len(tweet_ids)} tweet ID(s): {e}")
+
+def load_since_ids():
+    """Loads the newest fully processed tweet ID per query."""
+    if not os.path.exists(SINCE_IDS_FILE):
+        return {}
+    try:
+        with open(SINCE_IDS_FILE, 'rb') as f:
+            return orjson.loads(f.read())
     except Exception as e:
-        logging.error(f"Error saving tweet ID {tweet_id}: {e}")
+        logging.error(f"Error loading since IDs, fetching without them: {e}")
+        return {}
+
+def save_since_ids(since_ids):
+    """Saves the newest fully processed tweet ID per query."""
+    tmp_file = f"{SINCE_IDS_FILE}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(since_ids, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, SINCE_IDS_FILE)
+    except Exception as e:
+        logging.error(f"Error saving since IDs: {e}")
 
 def build_twitter_query(keywords, logic):
     """Builds the Twitter API v2 query string based on keywords and logic."""
     if not keywords:
         return ""
 
-    formatted_keywords = []
-    for k in keywords:
-        # Use quotes for multi-word phrases or special characters to search as exact phrase
-        if ' ' in k or any(char in k for char in ['#', '@', '$', ':', '(', ')', '[', ']', '{', '}', '"', '\'']):
-            formatted_keywords.append(f'"{k}"')
-        else:
-            formatted_keywords.append(k)
+    # Use quotes for multi-word phrases or special characters to search as exact phrase
+    formatted_keywords = [f'"{k}"' if _NEEDS_QUOTE(k) else k for k in keywords]
 
     if logic == "AND":
         return " ".join(formatted_keywords)
@@ -69,10 +174,48 @@ def build_twitter_query(keywords, logic):
         logging.warning(f"Unknown logic '{logic}'. Defaulting to 'OR'.")
         return " OR ".join(formatted_keywords)
 
-def send_to_discord(webhook_url, tweet_author_name, tweet_author_username, tweet_text, tweet_url,
-                    retweet_count=None, like_count=None, media_urls=None, is_error_notification=False):
-    """Sends content to a Discord webhook."""
-    
+def fetch_tweets(client, query, max_results, since_id=None, pagination_token=None):
+    """Runs a Twitter API v2 recent search for embeds; returns the response and the since_id actually used."""
+    params = dict(
+        query=query,
+        expansions=['author_id', 'attachments.media_keys'],
+        tweet_fields=['id', 'text', 'author_id', 'created_at', 'public_metrics', 'attachments'],
+        user_fields=['name', 'username', 'public_metrics', 'verified'],
+        media_fields=['url', 'preview_image_url', 'type'],
+        max_results=max_results
+    )
+    if pagination_token:
+        params["next_token"] = pagination_token
+    if since_id:
+        try:
+            return client.search_recent_tweets(since_id=since_id, **params), since_id
+        except tweepy.BadRequest as e:
+            # A next_token belongs to the since_id search, so a follow-up page can't drop it
+            if pagination_token:
+                raise
+            # since_id is rejected once it falls outside the 7-day recent search window
+            logging.warning(f"Ignoring since_id {since_id} for '{query}': {e}")
+    return client.search_recent_tweets(**params), None
+
+def extract_media_urls(tweet, media_items):
+    """Collects image URLs for a tweet's attachments, using preview images for videos."""
+    media_urls = []
+    if tweet.attachments and tweet.attachments.get('media_keys'):
+        for key in tweet.attachments['media_keys']:
+            m = media_items.get(key)
+            if m and m.type in ['photo', 'animated_gif'] and 'url' in m:
+                media_urls.append(m.url)
+            elif m and m.type == 'video' and 'preview_image_url' in m:
+                media_urls.append(m.preview_image_url)
+    return media_urls
+
+def build_discord_embed(tweet_author_name, tweet_author_username, tweet_text, tweet_url,
+                        retweet_count=None, like_count=None, media_urls=None, is_error_notification=False,
+                        timestamp=None):
+    """Builds the Discord embed for a tweet or an error notification."""
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).isoformat()
+
     if is_error_notification:
         color = 16711680 # Red 
         title = "❌ Bot Error Notification ❌"
@@ -84,7 +227,7 @@ def send_to_discord(webhook_url, tweet_author_name, tweet_author_username, tweet
             "footer": {
                 "text": "Twitter-Discord Bot Error"
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
     else:
         color = 5814783 # A Discord-like blue color
@@ -102,7 +245,7 @@ def send_to_discord(webhook_url, tweet_author_name, tweet_author_username, tweet
             "footer": {
                 "text": f"Likes: {like_count if like_count is not None else 'N/A'} | Retweets: {retweet_count if retweet_count is not None else 'N/A'} | Twitter Bot"
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
 
         if media_urls:
@@ -110,122 +253,259 @@ def send_to_discord(webhook_url, tweet_author_name, tweet_author_username, tweet
             embed["image"] = {"url": media_urls[0]}
             if len(media_urls) > 1:
               
-                additional_media_text = "\n\n**Additional Media:**\n" + "\n".join(media_urls[1:])
+                additional_media_text = "\n\n**Additional Media:**\n" + "\n".join(islice(media_urls, 1, None))
                 embed["description"] += additional_media_text
-        
+
+    return embed
+
+def embed_length(embed):
+    """Counts the characters Discord charges against a message's embed limit."""
+    return (len(embed.get("title", "")) + len(embed.get("description", ""))
+            + len(embed.get("footer", {}).get("text", "")) + len(embed.get("author", {}).get("name", "")))
+
+def chunk_embeds(items):
+    """Splits (tweet_id, embed) pairs into batches that fit in a single Discord message."""
+    batch = []
+    batch_chars = 0
+    for item in items:
+        chars = embed_length(item[1])
+        if batch and (len(batch) == DISCORD_MAX_EMBEDS or batch_chars + chars > DISCORD_MAX_EMBED_CHARS):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append(item)
+        batch_chars += chars
+    if batch:
+        yield batch
+
+async def send_to_discord(session, webhook_url, embeds, is_error_notification=False):
+    """Sends a batch of embeds from chunk_embeds to a Discord webhook in a single message."""
     payload = {
-        "embeds": [embed]
+        "embeds": embeds
     }
+    body = orjson.dumps(payload)
     headers = {
         "Content-Type": "application/json"
     }
-    try:
-        response = requests.post(webhook_url, json=payload, headers=headers)
-        response.raise_for_status()
-        if not is_error_notification:
-            logging.info(f"Successfully sent tweet to Discord.")
-        else:
-            logging.info(f"Successfully sent error notification to Discord.")
-    except requests.exceptions.HTTPError as errh:
-        logging.error(f"Discord Webhook HTTP Error: {errh} - Response: {response.text}")
-    except requests.exceptions.ConnectionError as errc:
-        logging.error(f"Discord Webhook Connection Error: {errc}")
-    except requests.exceptions.Timeout as errt:
-        logging.error(f"Discord Webhook Timeout Error: {errt}")
-    except requests.exceptions.RequestException as err:
-        logging.error(f"Discord Webhook Request Error: {err}")
-
-def send_error_notification(error_message, notifications_webhook_url):
+    for attempt in range(DISCORD_MAX_ATTEMPTS):
+        await _BUCKETS[webhook_url].acquire()
+        try:
+            async with session.post(webhook_url, data=body, headers=headers) as response:
+                if (response.status == 429 or response.status >= 500) and attempt == DISCORD_MAX_ATTEMPTS - 1:
+                    # No retries left, so don't sleep before giving up
+                    break
+                if response.status == 429:
+                    # Discord tells us how long to wait; jitter keeps concurrent retries from colliding
+                    retry_after = response.headers.get("Retry-After") or response.headers.get("X-RateLimit-Reset-After") or 1
+                    delay = float(retry_after) + random.uniform(0, 0.5)
+                    logging.warning(f"Discord rate limit hit. Retrying in {delay:.2f}s (attempt {attempt + 1}/{DISCORD_MAX_ATTEMPTS}).")
+                    await asyncio.sleep(delay)
+                    continue
+                if response.status >= 500:
+                    delay = 2 ** attempt
+                    logging.warning(f"Discord Webhook Server Error: {response.status}. Retrying in {delay}s (attempt {attempt + 1}/{DISCORD_MAX_ATTEMPTS}).")
+                    await asyncio.sleep(delay)
+                    continue
+                if response.status >= 400:
+                    logging.error(f"Discord Webhook HTTP Error: {response.status} - Response: {await response.text()}")
+                    return False
+            if not is_error_notification:
+                logging.info(f"Successfully sent {len(embeds)} tweet(s) to Discord.")
+            else:
+                logging.info(f"Successfully sent error notification to Discord.")
+            return True
+        except asyncio.TimeoutError as errt:
+            logging.error(f"Discord Webhook Timeout Error: {errt}")
+            return False
+        except aiohttp.ClientConnectionError as errc:
+            logging.error(f"Discord Webhook Connection Error: {errc}")
+            return False
+        except aiohttp.ClientError as err:
+            logging.error(f"Discord Webhook Request Error: {err}")
+            return False
+    logging.error(f"Giving up on Discord webhook after {DISCORD_MAX_ATTEMPTS} attempts (last status {response.status}).")
+    return False
+
+async def send_error_notification(session, error_message, notifications_webhook_url):
     """Sends a critical error notification to a dedicated Discord webhook."""
     if notifications_webhook_url:
         logging.error(f"Sending error notification: {error_message}")
-        send_to_discord(
-            webhook_url=notifications_webhook_url,
+        embed = build_discord_embed(
             tweet_author_name="Twitter Bot", # Placeholder
             tweet_author_username="bot_error", # Placeholder
             tweet_text=error_message,
             tweet_url="", # Not relevant for error
             is_error_notification=True
         )
+        await send_to_discord(session, notifications_webhook_url, [embed], is_error_notification=True)
     else:
         logging.error(f"Error notification webhook not configured. Error: {error_message}")
 
 # logggggggic
 
-def main():
+async def main():
     config = load_config()
     sent_tweet_ids = load_sent_tweet_ids()
+    since_ids = load_since_ids()
     notifications_webhook_url = config.get("notifications_webhook_url")
-    twitter_bearer_token = os.getenv(BEARER_TOKEN_ENV_VAR) or config.get("twitter_bearer_token")
-    if not twitter_bearer_token:
-        error_msg = f"Twitter Bearer Token not found. Please set the '{BEARER_TOKEN_ENV_VAR}' environment variable."
-        logging.error(error_msg)
-        send_error_notification(error_msg, notifications_webhook_url)
-        exit(1)
-    try:
-        client = tweepy.Client(twitter_bearer_token)
-    except Exception as e:
-        error_msg = f"Error initializing Tweepy client: {e}"
-        logging.error(error_msg)
-        send_error_notification(error_msg, notifications_webhook_url)
-        exit(1)
-    global_filters = config.get("global_filters", {})
-    search_limit = config.get("search_limit_per_keyword", 50)
-    for query, channel in config.get("keyword_channels", {}).items():
-        webhook_url = channel.get("discord_webhook_url")
-        user_filters = global_filters.copy()
-        user_filters.update(channel.get("user_filters", {}))
-        min_followers = user_filters.get("min_followers", 0)
-        only_verified = user_filters.get("only_verified", False)
-        whitelist = [u.lower() for u in user_filters.get("whitelist_usernames", [])]
-        blacklist = [u.lower() for u in user_filters.get("blacklist_usernames", [])]
-        tweets = client.search_recent_tweets(
-            query=query,
-            expansions=['author_id', 'attachments.media_keys'],
-            tweet_fields=['id', 'text', 'author_id', 'created_at', 'public_metrics', 'attachments'],
-            user_fields=['name', 'username', 'public_metrics', 'verified'],
-            media_fields=['url', 'preview_image_url', 'type'],
-            max_results=search_limit
+    connector = aiohttp.TCPConnector(limit_per_host=DISCORD_POOL_MAXSIZE, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(sock_connect=DISCORD_CONNECT_TIMEOUT, sock_read=DISCORD_READ_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        twitter_bearer_token = os.getenv(BEARER_TOKEN_ENV_VAR) or config.get("twitter_bearer_token")
+        if not twitter_bearer_token:
+            error_msg = f"Twitter Bearer Token not found. Please set the '{BEARER_TOKEN_ENV_VAR}' environment variable."
+            logging.error(error_msg)
+            await send_error_notification(session, error_msg, notifications_webhook_url)
+            exit(1)
+        try:
+            client = tweepy.Client(twitter_bearer_token)
+        except Exception as e:
+            error_msg = f"Error initializing Tweepy client: {e}"
+            logging.error(error_msg)
+            await send_error_notification(session, error_msg, notifications_webhook_url)
+            exit(1)
+        global_filters = config.get("global_filters", {})
+        search_limit = config.get("search_limit_per_keyword", 50)
+        # (tweet_id, embed) pairs waiting to be posted, grouped by destination webhook
+        pending = defaultdict(list)
+        # Per query: newest tweet ID of a fully read result set and the tweet IDs queued for Discord
+        newest_ids = {}
+        queued_ids = defaultdict(list)
+        # One clock read per run: used for the "today" filter and as every embed's timestamp
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        year, month, day = today.year, today.month, today.day
+        timestamp = now.isoformat()
+        channels = list(config.get("keyword_channels", {}).items())
+        # Fetch a small first page per query; more pages are only requested if filters leave too few tweets
+        page_size = max(TWITTER_MIN_PAGE_SIZE, min(search_limit, TWITTER_PAGE_SIZE))
+        loop = asyncio.get_running_loop()
+
+        async def collect_query(executor, query, channel):
+            """Fetches one query's pages and queues the tweets that pass its filters."""
+            # A failed search only skips its own query; the others are still processed and posted
+            try:
+                tweets, used_since_id = await loop.run_in_executor(
+                    executor, fetch_tweets, client, query, page_size, since_ids.get(query)
+                )
+            except Exception as e:
+                error_msg = f"Error searching tweets for '{query}': {e}"
+                logging.error(error_msg)
+                await send_error_notification(session, error_msg, notifications_webhook_url)
+                return
+            if used_since_id is None and since_ids.get(query):
+                # Twitter rejected the stored since_id; forget it so later runs don't repeat the failing call
+                since_ids.pop(query)
+            webhook_url = channel.get("discord_webhook_url")
+            user_filters = global_filters.copy()
+            user_filters.update(channel.get("user_filters", {}))
+            min_followers = user_filters.get("min_followers", 0)
+            only_verified = user_filters.get("only_verified", False)
+            whitelist = frozenset(u.lower() for u in user_filters.get("whitelist_usernames", []))
+            blacklist = frozenset(u.lower() for u in user_filters.get("blacklist_usernames", []))
+            sent_count = 0
+            fetched_count = 0
+            newest_id = None
+            # Cleared when the send cap or a failed page leaves results unread; since_id must not skip past them
+            exhausted = True
+            while tweets.data:
+                fetched_count += len(tweets.data)
+                newest_id = max(newest_id or 0, max(tweet.id for tweet in tweets.data))
+                includes = getattr(tweets, 'includes', None) or {}
+                users = {u.id: u for u in includes.get('users', ())}
+                # Lowercased once per author rather than once per tweet
+                usernames_lower = {user_id: u.username.lower() for user_id, u in users.items()}
+                media_items = {m.media_key: m for m in includes.get('media', ())}
+                for tweet in tweets.data:
+                    if sent_count >= TWITTER_MAX_SENDS_PER_QUERY:
+                        break
+                    # Cheapest filters first; media is only assembled for tweets that pass them all
+                    # Only send tweets created today
+                    created_at = getattr(tweet, 'created_at', None)
+                    if created_at is None or created_at.day != day or created_at.month != month or created_at.year != year:
+                        continue
+                    tweet_id = tweet.id
+                    if tweet_id in sent_tweet_ids:
+                        continue
+                    author_id = tweet.author_id
+                    author = users.get(author_id)
+                    if not author:
+                        continue
+                    username = usernames_lower[author_id]
+                    if whitelist and username not in whitelist:
+                        continue
+                    if blacklist and username in blacklist:
+                        continue
+                    if min_followers and author.public_metrics.get('followers_count', 0) < min_followers:
+                        continue
+                    if only_verified and not author.verified:
+                        continue
+                    author_username = author.username
+                    tweet_metrics = tweet.public_metrics
+                    media_urls = extract_media_urls(tweet, media_items)
+                    embed = build_discord_embed(author.name, author_username, tweet.text, f"https://twitter.com/{author_username}/status/{tweet_id}", tweet_metrics.get('retweet_count', 0), tweet_metrics.get('like_count', 0), media_urls, timestamp=timestamp)
+                    pending[webhook_url].append((tweet_id, embed))
+                    queued_ids[query].append(tweet_id)
+                    sent_tweet_ids.add(tweet_id)
+                    sent_count += 1
+                next_token = (tweets.meta or {}).get('next_token')
+                if sent_count >= TWITTER_MAX_SENDS_PER_QUERY:
+                    exhausted = False
+                    break
+                # Results are newest-first, so once a page reaches earlier days no later page can pass the
+                # "today" filter
+                oldest = min((tweet.created_at for tweet in tweets.data if tweet.created_at), default=None)
+                if oldest is not None and oldest.date() < today:
+                    break
+                # Another page must fit in what's left of search_limit at recent search's minimum page size.
+                # Reaching the limit counts as fully read: like the baseline, nothing past the newest
+                # search_limit tweets is ever looked at
+                remaining = search_limit - fetched_count
+                if not next_token or remaining < TWITTER_MIN_PAGE_SIZE:
+                    break
+                next_page_size = min(page_size, remaining)
+                try:
+                    tweets, _ = await loop.run_in_executor(
+                        executor, fetch_tweets, client, query, next_page_size, used_since_id, next_token
+                    )
+                except Exception as e:
+                    error_msg = f"Error fetching more tweets for '{query}': {e}"
+                    logging.error(error_msg)
+                    await send_error_notification(session, error_msg, notifications_webhook_url)
+                    exhausted = False
+                    break
+            # A partially read result set keeps the stored since_id; the sent-ID set skips what was already posted
+            if exhausted and newest_id is not None:
+                newest_ids[query] = newest_id
+
+        # Each query fetches and pages on its own task, so a query that needs more pages doesn't hold up the rest
+        with ThreadPoolExecutor(max_workers=TWITTER_MAX_WORKERS) as executor:
+            await asyncio.gather(*(collect_query(executor, query, channel) for query, channel in channels))
+
+        # Flush each webhook's embeds in chunks that fit Discord's per-message limits, posting all chunks concurrently
+        batches = []
+        for webhook_url, items in pending.items():
+            for batch in chunk_embeds(items):
+                batches.append((webhook_url, batch))
+        results = await asyncio.gather(
+            *(send_to_discord(session, webhook_url, [embed for _, embed in batch]) for webhook_url, batch in batches),
+            return_exceptions=True
         )
-        if not tweets.data:
-            continue
-        users = {u['id']: u for u in tweets.includes.get('users', [])} if tweets.includes else {}
-        media_items = {m['media_key']: m for m in tweets.includes.get('media', [])} if tweets.includes else {}
-        sent_count = 0
-        today = datetime.now(timezone.utc).date()
-        for tweet in tweets.data:
-            if sent_count >= 5:
-                break
-            # Only send tweets created today
-            tweet_created = tweet.created_at.date() if hasattr(tweet, 'created_at') and tweet.created_at else None
-            if tweet_created != today:
-                continue
-            if str(tweet.id) in sent_tweet_ids:
-                continue
-            author = users.get(tweet.author_id)
-            if not author:
-                continue
-            username = author.username.lower()
-            if whitelist and username not in whitelist:
-                continue
-            if blacklist and username in blacklist:
-                continue
-            if min_followers and author.public_metrics.get('followers_count', 0) < min_followers:
-                continue
-            if only_verified and not author.verified:
+        delivered_ids = []
+        for (webhook_url, batch), result in zip(batches, results):
+            if isinstance(result, Exception):
+                logging.error(f"Unexpected error sending {len(batch)} tweet(s) to Discord: {result}")
                 continue
-            media_urls = []
-            if tweet.attachments and tweet.attachments.get('media_keys'):
-                for key in tweet.attachments['media_keys']:
-                    m = media_items.get(key)
-                    if m and m.type in ['photo', 'animated_gif'] and 'url' in m:
-                        media_urls.append(m.url)
-                    elif m and m.type == 'video' and 'preview_image_url' in m:
-                        media_urls.append(m.preview_image_url)
-            send_to_discord(webhook_url, author.name, author.username, tweet.text, f"https://twitter.com/{author.username}/status/{tweet.id}", tweet.public_metrics.get('retweet_count', 0), tweet.public_metrics.get('like_count', 0), media_urls)
-            save_sent_tweet_id(tweet.id)
-            sent_tweet_ids.add(str(tweet.id))
-            sent_count += 1
+            if result:
+                delivered_ids.extend(tweet_id for tweet_id, _ in batch)
+        save_sent_tweet_ids(delivered_ids)
+        # Only move a query's since_id forward once everything queued for it reached Discord,
+        # so tweets from a failed post are fetched again on the next run
+        delivered = set(delivered_ids)
+        for query, newest_id in newest_ids.items():
+            if all(tweet_id in delivered for tweet_id in queued_ids[query]):
+                since_ids[query] = newest_id
+        save_since_ids(since_ids)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())